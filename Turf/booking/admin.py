@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Sport, Slot, Booking, SlotPricing, Contact
+from .models import Sport, Slot, Booking, BookingItem, SlotPricing, Contact, Job
+from .utils import search_bookings
 
 
 @admin.register(Sport)
@@ -27,11 +28,26 @@ class SlotAdmin(admin.ModelAdmin):
     ordering = ("date", "time")
 
 
+class BookingItemInline(admin.TabularInline):
+    model = BookingItem
+    extra = 0
+    raw_id_fields = ("slot",)
+    readonly_fields = ("unit_price", "discount", "price")
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ("user_name", "phone", "booking_id", "created_at")
+    list_display = ("user_name", "phone", "booking_id", "total_amount", "created_at")
+    inlines = (BookingItemInline,)
     search_fields = ("user_name", "phone", "booking_id")
     readonly_fields = ("booking_id", "created_at")
+    exclude = ("qr_code",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Indexed phone/ID/name lookup instead of icontains over every column
+        if not search_term:
+            return queryset, False
+        return search_bookings(queryset, search_term), False
 
 
 @admin.register(Contact)
@@ -53,3 +69,10 @@ class SlotPricingAdmin(admin.ModelAdmin):
     )
     list_filter = ("sport", "date", "active")
     search_fields = ("sport__name",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_at", "updated_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "updated_at")
@@ -0,0 +1,162 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from .models import BookingItem, Sport
+from .utils import DEFAULT_SLOT_PRICE
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+TIERS = ["off-peak", "standard", "peak"]
+
+# Utilization the suggested prices steer towards, and the tier cut-offs.
+TARGET_UTILIZATION = 0.6
+PEAK_UTILIZATION = 0.75
+OFF_PEAK_UTILIZATION = 0.3
+PRICE_SENSITIVITY = 0.5  # price change per unit of utilization gap
+MAX_PRICE_CHANGE = 0.25
+PRICE_STEP = 50
+
+
+def demand_report(weeks=52, recent_weeks=8, refresh=False):
+    """Cached demand heatmap and pricing suggestions for every sport."""
+    key = f"analytics:demand:{weeks}:{recent_weeks}"
+    report = None if refresh else cache.get(key)
+    if report is None:
+        report = build_demand_report(weeks, recent_weeks)
+        cache.set(key, report, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 60 * 60))
+    return report
+
+
+def build_demand_report(weeks=52, recent_weeks=8):
+    """Sport × weekday × hour occupancy from booking history.
+
+    History is aggregated by the database in a single GROUP BY query
+    (sport, period, weekday, hour), so the Python side only ever sees a
+    few thousand rows; everything after that is array arithmetic.
+    Periods: 0 = last `recent_weeks`, 1 = the `recent_weeks` before
+    that (for trends), 2 = the rest of the window.
+    """
+    today = timezone.localdate()
+    since = today - timedelta(weeks=weeks)
+    recent_since = today - timedelta(weeks=recent_weeks)
+    previous_since = recent_since - timedelta(weeks=recent_weeks)
+
+    rows = list(
+        BookingItem.objects.filter(slot__date__gte=since, slot__date__lt=today)
+        .annotate(
+            period=Case(
+                When(slot__date__gte=recent_since, then=Value(0)),
+                When(slot__date__gte=previous_since, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            ),
+            weekday=ExtractIsoWeekDay("slot__date"),
+            hour=ExtractHour("slot__time"),
+        )
+        .values("slot__sport_id", "period", "weekday", "hour")
+        .annotate(booked=Count("id"), revenue=Sum("price"))
+        .values_list("slot__sport_id", "period", "weekday", "hour", "booked", "revenue")
+        .order_by()
+    )
+
+    sports = list(Sport.objects.order_by("id").values_list("id", "name"))
+    sport_ids = np.array([sport_id for sport_id, _ in sports], dtype=np.int64)
+    shape = (len(sports), 3, 7, 24)
+    booked = np.zeros(shape)
+    revenue = np.zeros(shape)
+
+    if rows and len(sports):
+        data = np.array(rows, dtype=np.int64)
+        index = (np.searchsorted(sport_ids, data[:, 0]), data[:, 1], data[:, 2] - 1, data[:, 3])
+        np.add.at(booked, index, data[:, 4])
+        np.add.at(revenue, index, data[:, 5])
+
+    # How many of each weekday every period contains: the denominator.
+    dates = np.arange(np.datetime64(since), np.datetime64(today))
+    date_weekday = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    date_period = np.where(
+        dates >= np.datetime64(recent_since), 0, np.where(dates >= np.datetime64(previous_since), 1, 2)
+    )
+    days = np.zeros((3, 7))
+    np.add.at(days, (date_period, date_weekday), 1)
+
+    total_booked = booked.sum(axis=1)  # (sport, weekday, hour)
+    total_revenue = revenue.sum(axis=1)
+    utilization = _ratio(total_booked, days.sum(axis=0)[None, :, None])
+    trend = _ratio(booked[:, 0], days[0][None, :, None]) - _ratio(booked[:, 1], days[1][None, :, None])
+
+    # Pricing works per hour of day (SlotPricing has no weekday), so fold
+    # the weekdays together for the suggestions.
+    hourly_utilization = _ratio(total_booked.sum(axis=1), days.sum())
+    hourly_booked = total_booked.sum(axis=1)
+    sport_average = _ratio(total_revenue.sum(axis=(1, 2)), total_booked.sum(axis=(1, 2)))
+    sport_average = np.where(sport_average > 0, sport_average, DEFAULT_SLOT_PRICE)
+    current_price = np.where(
+        hourly_booked > 0,
+        _ratio(total_revenue.sum(axis=1), hourly_booked),
+        sport_average[:, None],
+    )
+
+    factor = np.clip(
+        1 + PRICE_SENSITIVITY * (hourly_utilization - TARGET_UTILIZATION),
+        1 - MAX_PRICE_CHANGE,
+        1 + MAX_PRICE_CHANGE,
+    )
+    suggested = np.round(current_price * factor / PRICE_STEP) * PRICE_STEP
+    tiers = (hourly_utilization > OFF_PEAK_UTILIZATION).astype(int) + (hourly_utilization >= PEAK_UTILIZATION)
+
+    report = []
+    for i, (sport_id, name) in enumerate(sports):
+        report.append({
+            "id": sport_id,
+            "name": name,
+            "bookings": int(total_booked[i].sum()),
+            "revenue": int(total_revenue[i].sum()),
+            "utilization": round(float(utilization[i].mean()), 3),
+            "heatmap": [
+                {
+                    "day": WEEKDAYS[d],
+                    "cells": [
+                        {"u": round(float(u), 3), "pct": int(round(u * 100)), "trend": int(round(t * 100))}
+                        for u, t in zip(utilization[i, d], trend[i, d])
+                    ],
+                }
+                for d in range(7)
+            ],
+            "bands": _bands(tiers[i], hourly_utilization[i], current_price[i], suggested[i]),
+        })
+
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "since": since.isoformat(),
+        "weeks": weeks,
+        "recent_weeks": recent_weeks,
+        "sports": report,
+    }
+
+
+def _ratio(numerator, denominator):
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, float), np.asarray(denominator, float))
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _bands(tiers, utilization, current, suggested):
+    """Collapse 24 hourly tiers into contiguous price bands."""
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(tiers)) + 1))
+    ends = np.append(starts[1:], 24)
+    return [
+        {
+            "start": int(start),
+            "end": int(end),
+            "tier": TIERS[tiers[start]],
+            "utilization": round(float(utilization[start:end].mean()), 3),
+            "current_price": int(round(current[start:end].mean())),
+            "suggested_price": int(round(suggested[start:end].mean() / PRICE_STEP) * PRICE_STEP),
+        }
+        for start, end in zip(starts, ends)
+    ]
@@ -1,5 +1,22 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        if getattr(settings, "PRELOAD_HEAVY_IMPORTS", False):
+            from .warmup import preload
+            preload()
+
+        limits = getattr(settings, "RATE_LIMITS", {}) or getattr(settings, "CONCURRENCY_LIMITS", {})
+        if limits and not getattr(settings, "ADMISSION_CONTROL_ENABLED", False):
+            logger.warning(
+                "Admission control is disabled: RATE_LIMITS and CONCURRENCY_LIMITS "
+                "need a shared cache. Set REDIS_URL to enable them."
+            )
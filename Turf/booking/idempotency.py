@@ -0,0 +1,70 @@
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import redirect
+
+FIELD = "idempotency_key"
+
+
+def _ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", 15 * 60)
+
+
+def _result_key(key):
+    return f"booking:idem:{key}"
+
+
+def _lock_key(key):
+    return f"booking:idem:{key}:lock"
+
+
+def issue_key():
+    """New key for a payment form; the confirm POST carries it back."""
+    return uuid.uuid4().hex
+
+
+def idempotent(view_func):
+    """Replay the first successful response for repeated POSTs of one key.
+
+    The first request holds a short lock while it runs. Duplicates that
+    arrive meanwhile wait briefly for its result instead of touching the
+    slots themselves; later retries are answered straight from the cache.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.POST.get(FIELD) if request.method == "POST" else None
+        if not key:
+            return view_func(request, *args, **kwargs)
+
+        cached = cache.get(_result_key(key))
+        if cached is not None:
+            return HttpResponse(cached)
+
+        if not cache.add(_lock_key(key), 1, getattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT", 30)):
+            return _wait_for_result(key)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(_result_key(key), response.content, _ttl())
+            return response
+        finally:
+            cache.delete(_lock_key(key))
+    return wrapper
+
+
+def _wait_for_result(key):
+    deadline = time.monotonic() + getattr(settings, "IDEMPOTENCY_WAIT", 5)
+    while time.monotonic() < deadline:
+        time.sleep(0.2)
+        cached = cache.get(_result_key(key))
+        if cached is not None:
+            return HttpResponse(cached)
+        if cache.get(_lock_key(key)) is None:
+            # first attempt finished without a result, i.e. it was rejected
+            return redirect("home")
+    return HttpResponse("Your booking is still being processed. Please refresh in a moment.", status=409)
@@ -0,0 +1,161 @@
+import logging
+import traceback
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, Job
+from .utils import generate_qr_base64
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+# ================= REGISTRY =================
+
+def job(name):
+    """Register a function as the handler for jobs called `name`."""
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """Queue a job once the surrounding transaction commits.
+
+    Rolled back requests never leave jobs behind, and the worker never
+    picks up a job for a booking it cannot see yet.
+    """
+    def _create():
+        Job.objects.create(
+            name=name,
+            payload=payload,
+            max_attempts=getattr(settings, "JOB_QUEUE_MAX_ATTEMPTS", 5),
+        )
+    transaction.on_commit(_create)
+
+
+# ================= WORKER =================
+
+def requeue_stale():
+    """Put jobs left RUNNING by a crashed worker back in the queue.
+
+    Jobs that have used up their attempts are failed instead, so a job
+    that keeps killing its worker is not retried forever.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "JOB_QUEUE_STALE_AFTER", 600))
+    stale = Job.objects.filter(status=Job.RUNNING, updated_at__lt=cutoff)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, last_error="Worker stopped responding", updated_at=timezone.now()
+    )
+    return stale.update(status=Job.PENDING, updated_at=timezone.now())
+
+
+def prune_done(days):
+    """Delete finished jobs older than `days`; failed ones are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status=Job.DONE, updated_at__lt=cutoff).delete()
+    return deleted
+
+
+def claim_due(limit):
+    """Claim up to `limit` due jobs and return their ids.
+
+    Each claim is a conditional UPDATE, so several workers can poll the
+    same table without handing one job out twice.
+    """
+    due = Job.objects.filter(
+        status=Job.PENDING,
+        run_at__lte=timezone.now(),
+        attempts__lt=F("max_attempts"),
+    ).values_list("id", flat=True)[:limit]
+
+    claimed = []
+    for job_id in due:
+        won = Job.objects.filter(id=job_id, status=Job.PENDING, attempts__lt=F("max_attempts")).update(
+            status=Job.RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+        if won:
+            claimed.append(job_id)
+    return claimed
+
+
+def run_job(job_id):
+    close_old_connections()
+    try:
+        job = Job.objects.get(id=job_id)
+        handler = HANDLERS.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job '{job.name}'")
+            handler(**job.payload)
+        except Exception:
+            _fail(job, traceback.format_exc())
+            return False
+
+        job.status = Job.DONE
+        job.last_error = ""
+        job.save(update_fields=["status", "last_error", "updated_at"])
+        return True
+    finally:
+        close_old_connections()
+
+
+def _fail(job, error):
+    job.last_error = error
+    if job.attempts < job.max_attempts:
+        delay = getattr(settings, "JOB_QUEUE_RETRY_DELAY", 30) * 2 ** (job.attempts - 1)
+        job.status = Job.PENDING
+        job.run_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning("Job %s failed (attempt %s), retrying in %ss", job, job.attempts, delay)
+    else:
+        job.status = Job.FAILED
+        logger.error("Job %s failed permanently:\n%s", job, error)
+    job.save(update_fields=["status", "run_at", "last_error", "updated_at"])
+
+
+def process_initializer():
+    """Entry point for process-pool workers."""
+    django.setup()
+    connections.close_all()
+
+
+# ================= HANDLERS =================
+
+@job("booking.render_qr")
+def render_booking_qr(booking_id):
+    booking = Booking.objects.get(id=booking_id)
+    if not booking.qr_code:
+        Booking.objects.filter(id=booking_id).update(qr_code=generate_qr_base64(booking))
+
+
+@job("booking.notify_confirmed")
+def notify_booking_confirmed(booking_id):
+    booking = Booking.objects.prefetch_related("slots__sport").get(id=booking_id)
+    slots = sorted(booking.slots.all(), key=lambda s: (s.date, s.time))
+    lines = [str(slot) for slot in slots]
+    logger.info("Booking confirmed: %s (%s slots)", booking, len(lines))
+
+    recipients = getattr(settings, "BOOKING_NOTIFY_EMAILS", [])
+    if recipients:
+        send_mail(
+            subject=f"New booking: {booking.user_name}",
+            message="\n".join([
+                f"Name: {booking.user_name}",
+                f"Phone: {booking.phone}",
+                f"Booking ID: {booking.booking_id}",
+                "",
+                *lines,
+            ]),
+            from_email=None,
+            recipient_list=recipients,
+        )
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from booking.models import Booking, BookingItem
+from booking.utils import get_slot_price_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in prices for booking items created before prices were snapshotted. "
+        "Old prices were never stored, so the current pricing rules are used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        items_done = bookings_done = 0
+
+        while True:
+            items = list(
+                BookingItem.objects.filter(price=0)
+                .select_related("slot")
+                .order_by("id")[:batch_size]
+            )
+            if not items:
+                break
+
+            prices = get_slot_price_items([item.slot for item in items])
+            for item in items:
+                item.unit_price, item.discount, item.price = prices[item.slot_id]
+
+            booking_ids = {item.booking_id for item in items}
+            with transaction.atomic():
+                BookingItem.objects.bulk_update(items, ["unit_price", "discount", "price"])
+
+                totals = (
+                    BookingItem.objects.filter(booking_id__in=booking_ids)
+                    .values("booking_id")
+                    .annotate(total=Sum("price"))
+                )
+                bookings = [Booking(id=row["booking_id"], total_amount=row["total"]) for row in totals]
+                Booking.objects.bulk_update(bookings, ["total_amount"])
+
+            items_done += len(items)
+            bookings_done += len(booking_ids)
+            self.stdout.write(f"  {items_done} items priced")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {items_done} booking items across {bookings_done} bookings"
+        ))
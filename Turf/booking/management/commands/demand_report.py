@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.analytics import demand_report
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cached demand heatmap and print suggested price bands per sport."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--weeks", type=int, default=52, help="Weeks of history to analyse.")
+        parser.add_argument(
+            "--recent-weeks",
+            type=int,
+            default=8,
+            help="Window compared against the one before it for trends.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        report = demand_report(options["weeks"], options["recent_weeks"], refresh=True)
+        elapsed = time.perf_counter() - started
+
+        for sport in report["sports"]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{sport['name']}: {sport['bookings']} booked slots, "
+                f"₹{sport['revenue']}, {sport['utilization']:.0%} utilized"
+            ))
+            for band in sport["bands"]:
+                self.stdout.write(
+                    f"  {band['start']:02d}:00–{band['end']:02d}:00  {band['tier']:<9} "
+                    f"{band['utilization']:>4.0%}  ₹{band['current_price']} → ₹{band['suggested_price']}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Report since {report['since']} built and cached in {elapsed * 1000:.0f} ms"
+        ))
@@ -0,0 +1,213 @@
+import random
+import time as clock
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking, BookingItem, Slot, SlotPricing, Sport
+from gallery.models import GalleryImage
+
+SPORT_NAMES = ["Football", "Cricket", "Badminton", "Tennis", "Pickleball", "Basketball", "Volleyball"]
+FIRST_NAMES = ["Aarav", "Vihaan", "Aditya", "Arjun", "Sai", "Rohan", "Ishaan", "Kabir", "Ananya",
+               "Diya", "Priya", "Meera", "Kavya", "Rahul", "Karthik", "Nikhil", "Sneha", "Varun"]
+LAST_NAMES = ["Sharma", "Verma", "Reddy", "Nair", "Iyer", "Patel", "Singh", "Gupta", "Rao",
+              "Menon", "Das", "Joshi", "Kulkarni", "Shetty", "Pillai"]
+
+# Relative demand per hour of day: dead overnight, busy early morning,
+# quiet midday, peak in the evening.
+HOUR_WEIGHTS = [
+    0.02, 0.01, 0.01, 0.01, 0.02, 0.15, 0.45, 0.55, 0.35, 0.20, 0.12, 0.10,
+    0.10, 0.10, 0.12, 0.18, 0.35, 0.60, 0.90, 1.00, 0.95, 0.80, 0.45, 0.15,
+]
+WEEKEND_BOOST = 1.35
+BOOKING_LENGTHS = [1, 1, 1, 2, 2, 3]  # hours per booking
+BOOKING_LEAD_MINUTES = (30, 14 * 24 * 60)  # how long before the slot a booking is made
+
+# Fixed so the same seed always produces the same rows, whatever the day.
+DEFAULT_END_DATE = date(2026, 6, 30)
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate a deterministic synthetic dataset for scale testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--sports", type=int, default=3, help="Sports to create.")
+        parser.add_argument(
+            "--end-date",
+            type=parse_date,
+            default=DEFAULT_END_DATE,
+            help=f"Last day of history, YYYY-MM-DD (default {DEFAULT_END_DATE}).",
+        )
+        parser.add_argument("--days", type=int, default=730, help="Days of history per sport.")
+        parser.add_argument("--future-days", type=int, default=30, help="Days of upcoming slots per sport.")
+        parser.add_argument(
+            "--occupancy",
+            type=float,
+            default=0.6,
+            help="Booking probability at the busiest hour (0-1); other hours scale down.",
+        )
+        parser.add_argument("--customers", type=int, default=5000, help="Distinct customers to draw from.")
+        parser.add_argument("--gallery", type=int, default=50, help="Gallery records to create.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not 0 <= options["occupancy"] <= 1:
+            raise CommandError("--occupancy must be between 0 and 1")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = clock.perf_counter()
+
+        customers = [
+            (
+                f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                f"{self.rng.choice('6789')}{self.rng.randrange(10 ** 9):09d}",
+            )
+            for _ in range(max(options["customers"], 1))
+        ]
+
+        end_date = options["end_date"]
+        first_day = end_date - timedelta(days=options["days"])
+        last_day = end_date + timedelta(days=options["future_days"])
+
+        totals = {"sports": 0, "pricing": 0, "slots": 0, "bookings": 0}
+
+        for index in range(options["sports"]):
+            with transaction.atomic():
+                sport = self._create_sport(index)
+                prices, rules = self._create_pricing(sport, first_day, last_day)
+                totals["sports"] += 1
+                totals["pricing"] += rules
+
+                day = first_day
+                while day <= last_day:
+                    chunk_end = min(day + timedelta(days=29), last_day)
+                    slots, bookings = self._fill_days(
+                        sport, day, chunk_end, prices, customers, options["occupancy"]
+                    )
+                    totals["slots"] += slots
+                    totals["bookings"] += bookings
+                    day = chunk_end + timedelta(days=1)
+
+            self.stdout.write(f"  {sport.name}: done ({clock.perf_counter() - started:.1f}s)")
+
+        GalleryImage.objects.bulk_create(
+            [
+                GalleryImage(title=f"Match day {i + 1}", image=f"gallery/load_{i + 1}.jpg",
+                             active=self.rng.random() < 0.9)
+                for i in range(options["gallery"])
+            ],
+            batch_size=self.batch_size,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['sports']} sports, {totals['pricing']} pricing rules, "
+            f"{totals['slots']} slots, {totals['bookings']} bookings and "
+            f"{options['gallery']} gallery images in {clock.perf_counter() - started:.1f}s"
+        ))
+
+    # ---------- helpers ----------
+
+    def _create_sport(self, index):
+        name = SPORT_NAMES[index % len(SPORT_NAMES)]
+        if index >= len(SPORT_NAMES):
+            name = f"{name} {index // len(SPORT_NAMES) + 1}"
+        return Sport.objects.create(name=name)
+
+    def _create_pricing(self, sport, first_day, last_day):
+        """A base rule, an evening peak rule and a few dated specials.
+
+        Returns (the prices to snapshot on booking items, number of rules).
+        """
+        base = self.rng.randrange(1000, 1600, 100)
+        peak = base + self.rng.randrange(200, 600, 100)
+        # Undated rules are matched in id order, so the narrower peak rule
+        # has to be created before the all-day base rule.
+        rules = [
+            SlotPricing(sport=sport, price=peak, start_time=time(18, 0), end_time=time(22, 0)),
+            SlotPricing(sport=sport, price=base, discount=self.rng.choice([0, 0, 100])),
+        ]
+        span = (last_day - first_day).days
+        for _ in range(max(span // 90, 1)):
+            rules.append(SlotPricing(
+                sport=sport,
+                date=first_day + timedelta(days=self.rng.randrange(span + 1)),
+                price=peak + 300,
+            ))
+        SlotPricing.objects.bulk_create(rules)
+
+        prices = {
+            "base": (rules[1].price, rules[1].discount, rules[1].final_price()),
+            "peak": (peak, 0, peak),
+            "special": {rule.date: (rule.price, 0, rule.price) for rule in rules[2:]},
+        }
+        return prices, len(rules)
+
+    def _price(self, prices, day, hour):
+        """(unit_price, discount, price) the way get_slot_price would pick it."""
+        if day in prices["special"]:
+            return prices["special"][day]
+        if 18 <= hour <= 22:
+            return prices["peak"]
+        return prices["base"]
+
+    def _fill_days(self, sport, first, last, prices, customers, occupancy):
+        slots = []
+        runs = []  # (first slot index, length)
+
+        day = first
+        while day <= last:
+            boost = WEEKEND_BOOST if day.weekday() >= 5 else 1
+            hour = 0
+            while hour < 24:
+                if self.rng.random() < min(HOUR_WEIGHTS[hour] * boost * occupancy, 1):
+                    length = min(self.rng.choice(BOOKING_LENGTHS), 24 - hour)
+                    runs.append((len(slots), length))
+                    for offset in range(length):
+                        slots.append(Slot(sport=sport, date=day, time=time(hour + offset, 0), is_booked=True))
+                    hour += length
+                else:
+                    slots.append(Slot(sport=sport, date=day, time=time(hour, 0)))
+                    hour += 1
+            day += timedelta(days=1)
+
+        Slot.objects.bulk_create(slots, batch_size=self.batch_size)
+
+        bookings = []
+        booked_at = []
+        items = []
+        for start, length in runs:
+            name, phone = self.rng.choice(customers)
+            first_slot = slots[start]
+            booking = Booking(
+                booking_id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                user_name=name,
+                phone=phone,
+                phone_normalized=phone,
+            )
+            booked_at.append(timezone.make_aware(
+                datetime.combine(first_slot.date, first_slot.time)
+            ) - timedelta(minutes=self.rng.randrange(*BOOKING_LEAD_MINUTES)))
+            for slot in slots[start:start + length]:
+                unit_price, discount, price = self._price(prices, slot.date, slot.time.hour)
+                items.append(BookingItem(
+                    booking=booking, slot=slot, unit_price=unit_price, discount=discount, price=price,
+                ))
+                booking.total_amount += price
+            bookings.append(booking)
+
+        Booking.objects.bulk_create(bookings, batch_size=self.batch_size)
+        # created_at is auto_now_add, so it can only be set after the insert
+        for booking, created_at in zip(bookings, booked_at):
+            booking.created_at = created_at
+        Booking.objects.bulk_update(bookings, ["created_at"], batch_size=self.batch_size)
+        BookingItem.objects.bulk_create(items, batch_size=self.batch_size)
+        return len(slots), len(bookings)
@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from booking import jobs
+
+PRUNE_INTERVAL = 60 * 60  # seconds between retention sweeps
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker (QR codes, booking notifications)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "JOB_QUEUE_WORKERS", 2),
+            help="Number of jobs to run in parallel.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs in a thread pool (default) or a process pool.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=getattr(settings, "JOB_QUEUE_RETENTION_DAYS", 7),
+            help="Delete finished jobs older than this many days.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs that are due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+
+        if options["pool"] == "process":
+            # Children must not inherit the parent's open DB connections.
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=jobs.process_initializer)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+
+        self.stdout.write(f"Worker started ({workers} {options['pool']} workers)")
+        done = failed = 0
+        pruned_at = None
+
+        try:
+            with pool:
+                while True:
+                    if pruned_at is None or time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                        pruned = jobs.prune_done(options["keep_days"])
+                        if pruned:
+                            self.stdout.write(f"Pruned {pruned} finished jobs")
+                        pruned_at = time.monotonic()
+
+                    jobs.requeue_stale()
+                    claimed = jobs.claim_due(limit=workers * 4)
+
+                    if claimed:
+                        for ok in pool.map(jobs.run_job, claimed):
+                            if ok:
+                                done += 1
+                            else:
+                                failed += 1
+                        continue
+
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped: {done} done, {failed} failed"))
@@ -0,0 +1,118 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from booking.warmup import HEAVY_MODULES
+
+APP_MODULES = (
+    "booking.views",
+    "booking.jobs",
+    "gallery.views",
+    "turf_booking.urls",
+)
+
+# Each measurement runs in a fresh interpreter so nothing is already imported.
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+start = time.perf_counter()
+__import__(sys.argv[1])
+print(json.dumps({"setup": setup, "import": time.perf_counter() - start}))
+"""
+
+RESPONSE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+client = Client(HTTP_HOST="localhost")
+results = {"setup": time.perf_counter() - start, "paths": []}
+for path in sys.argv[1:]:
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        timings.append(time.perf_counter() - start)
+    results["paths"].append({"path": path, "status": status, "first": timings[0], "second": timings[1]})
+print(json.dumps(results))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start cost: per-module import time and time to first response."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Fresh interpreters per measurement; the best run is reported.",
+        )
+        parser.add_argument(
+            "--module",
+            action="append",
+            default=[],
+            help="Extra module to time (repeatable).",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            default=[],
+            help="URL path to time (repeatable). Defaults to /, /contact/ and /gallery/.",
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(options["repeat"], 1)
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get(
+            "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE
+        )}
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Import time (fresh process, after django.setup())"))
+        setups = []
+        for module in [*HEAVY_MODULES, *APP_MODULES, *options["module"]]:
+            runs = [self._run(IMPORT_SCRIPT, [module], env) for _ in range(repeat)]
+            runs = [run for run in runs if run]
+            if not runs:
+                self.stdout.write(f"  {module:<32} failed")
+                continue
+            setups.extend(run["setup"] for run in runs)
+            self.stdout.write(f"  {module:<32} {min(run['import'] for run in runs) * 1000:8.1f} ms")
+
+        if setups:
+            self.stdout.write(f"  {'django.setup()':<32} {min(setups) * 1000:8.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Time to first response (fresh process)"))
+        paths = options["path"] or ["/", "/contact/", "/gallery/"]
+        runs = [self._run(RESPONSE_SCRIPT, paths, env) for _ in range(repeat)]
+        runs = [run for run in runs if run]
+        if not runs:
+            self.stdout.write("  failed")
+            return
+
+        best = min(runs, key=lambda run: sum(p["first"] for p in run["paths"]))
+        for row in best["paths"]:
+            self.stdout.write(
+                f"  {row['path']:<32} [{row['status']}] first {row['first'] * 1000:8.1f} ms"
+                f"   warm {row['second'] * 1000:8.1f} ms"
+            )
+
+    def _run(self, script, argv, env):
+        result = subprocess.run(
+            [sys.executable, "-c", script, *argv],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+            return None
+        return json.loads(result.stdout.strip().splitlines()[-1])
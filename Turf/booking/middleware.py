@@ -0,0 +1,276 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("booking.slow_requests")
+
+INFLIGHT_TTL = 60  # only matters if a worker dies mid-request
+
+# Refill and take a token in one step so concurrent requests cannot both
+# spend the last one. Returns {allowed, tokens left}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "stamp")
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - stamp, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "stamp", tostring(now))
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+_bucket_lock = threading.Lock()
+
+
+# ================= HELPERS =================
+
+def admission_cache():
+    return caches["admission"]
+
+
+def client_key(request):
+    """Who a request is charged to: the logged-in user, else the client IP."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+
+    ip = request.META.get("REMOTE_ADDR", "")
+    # Each proxy appends the address it received the request from, so only
+    # the last RATE_LIMIT_TRUSTED_PROXIES entries are trustworthy; anything
+    # left of them was sent by the client.
+    hops = getattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    if hops > 0:
+        forwarded = [part.strip() for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")]
+        forwarded = [part for part in forwarded if part]
+        if len(forwarded) >= hops:
+            ip = forwarded[-hops]
+    return f"ip:{ip}"
+
+
+def _url_name(request):
+    try:
+        return resolve(request.path_info).url_name
+    except Resolver404:
+        return None
+
+
+def _incr(cache, key, timeout):
+    """Atomic increment that creates the key on first use."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+def _count(url_name, outcome):
+    _incr(admission_cache(), f"admission:{url_name}:{outcome}", None)
+
+
+def admission_counters():
+    """Admitted / rate-limited / shed totals for every guarded URL name."""
+    names = set(getattr(settings, "RATE_LIMITS", {})) | set(getattr(settings, "CONCURRENCY_LIMITS", {}))
+    outcomes = ("admitted", "rate_limited", "shed")
+    keys = [f"admission:{name}:{outcome}" for name in sorted(names) for outcome in outcomes]
+    values = admission_cache().get_many(keys)
+    return {
+        name: {outcome: values.get(f"admission:{name}:{outcome}", 0) for outcome in outcomes}
+        for name in sorted(names)
+    }
+
+
+def take_token(bucket, capacity, period):
+    """Token bucket: `capacity` requests, refilled evenly over `period` seconds.
+
+    Returns (allowed, seconds_until_next_token).
+    """
+    cache = admission_cache()
+    now = time.time()
+    rate = capacity / period
+
+    if isinstance(cache, RedisCache):
+        key = cache.make_and_validate_key(bucket)
+        client = cache._cache.get_client(key, write=True)
+        allowed, tokens = client.eval(TOKEN_BUCKET_SCRIPT, 1, key, capacity, rate, now, int(period) + 1)
+        tokens = float(tokens)
+    else:
+        # A local-memory cache lives in this process, so a lock is enough.
+        with _bucket_lock:
+            tokens, stamp = cache.get(bucket) or (capacity, now)
+            tokens = min(capacity, tokens + max(now - stamp, 0) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            cache.set(bucket, (tokens, now), period)
+
+    if not allowed:
+        return False, (1 - tokens) / rate
+    return True, 0
+
+
+# ================= MIDDLEWARE =================
+
+class AdmissionControlMiddleware:
+    """Per-client rate limits and a global in-flight cap, keyed by URL name.
+
+    Configured with RATE_LIMITS = {url_name: (requests, seconds)} and
+    CONCURRENCY_LIMITS = {url_name: max_in_flight}; the in-flight cap only
+    applies to POSTs. Rejected requests get a fast 429/503 instead of
+    queueing on the database. Counters live in the "admission" cache, so
+    the middleware only runs when ADMISSION_CONTROL_ENABLED says that cache
+    is shared by every worker.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "ADMISSION_CONTROL_ENABLED", False):
+            # BookingConfig.ready() has already warned about it
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate_limits = getattr(settings, "RATE_LIMITS", {})
+        concurrency_limits = getattr(settings, "CONCURRENCY_LIMITS", {})
+        if not rate_limits and not concurrency_limits:
+            return self.get_response(request)
+
+        url_name = _url_name(request)
+
+        if url_name in rate_limits:
+            capacity, period = rate_limits[url_name]
+            allowed, retry_after = take_token(
+                f"ratelimit:{url_name}:{client_key(request)}", capacity, period
+            )
+            if not allowed:
+                _count(url_name, "rate_limited")
+                response = HttpResponse("Too many requests. Please slow down.", status=429)
+                response["Retry-After"] = max(int(retry_after + 0.5), 1)
+                return response
+
+        if url_name in concurrency_limits and request.method == "POST":
+            return self._guarded(request, url_name, concurrency_limits[url_name])
+
+        if url_name in rate_limits:
+            _count(url_name, "admitted")
+        return self.get_response(request)
+
+    def _guarded(self, request, url_name, limit):
+        cache = admission_cache()
+        key = f"inflight:{url_name}"
+        in_flight = _incr(cache, key, INFLIGHT_TTL)
+
+        try:
+            if in_flight > limit:
+                _count(url_name, "shed")
+                logger.warning("Shedding %s: %s requests in flight", url_name, in_flight - 1)
+                response = HttpResponse("Booking is busy right now. Please try again.", status=503)
+                response["Retry-After"] = 1
+                return response
+
+            _count(url_name, "admitted")
+            return self.get_response(request)
+        finally:
+            try:
+                # The key may have expired and been recreated mid-request;
+                # never let that push the counter below zero.
+                if cache.decr(key) < 0:
+                    cache.incr(key)
+            except ValueError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Profile a single request on demand for staff users.
+
+    Triggered by ``?profile=1`` or an ``X-Profile: 1`` header. The page is
+    replaced by a cProfile report (``?profile=raw`` returns the .prof file
+    for snakeviz and friends). Must sit after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get("profile") or request.META.get("HTTP_X_PROFILE")
+        user = getattr(request, "user", None)
+        if mode not in ("1", "raw") or user is None or not user.is_staff:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        response = profiler.runcall(self.get_response, request)
+        elapsed = time.perf_counter() - start
+
+        if mode == "raw":
+            profiler.create_stats()
+            report = HttpResponse(marshal.dumps(profiler.stats), content_type="application/octet-stream")
+            report["Content-Disposition"] = 'attachment; filename="request.prof"'
+            return report
+
+        out = io.StringIO()
+        out.write(f"{request.method} {request.get_full_path()} -> {response.status_code} in {elapsed * 1000:.1f} ms\n\n")
+        stats = pstats.Stats(profiler, stream=out)
+        sort = request.GET.get("sort")
+        stats.sort_stats(sort if sort in ("cumulative", "tottime", "calls") else "cumulative").print_stats(
+            getattr(settings, "PROFILE_TOP_FUNCTIONS", 40)
+        )
+        return HttpResponse(out.getvalue(), content_type="text/plain; charset=utf-8")
+
+
+class SlowRequestMiddleware:
+    """Log every request slower than SLOW_REQUEST_THRESHOLD_MS.
+
+    Each entry carries the URL name, duration, query count and the slowest
+    SQL statements, timed through a connection execute wrapper.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def timed(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((time.perf_counter() - start, sql))
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(timed):
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if elapsed_ms >= getattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 500):
+            match = getattr(request, "resolver_match", None)
+            top = sorted(queries, reverse=True)[:getattr(settings, "SLOW_REQUEST_TOP_QUERIES", 3)]
+            slow_logger.warning(
+                "Slow request: %s %s (%s) %.0f ms, %s queries (%.0f ms in SQL)\n%s",
+                request.method,
+                request.path,
+                match.url_name if match else "-",
+                elapsed_ms,
+                len(queries),
+                sum(duration for duration, _ in queries) * 1000,
+                "\n".join(f"  {duration * 1000:7.1f} ms  {sql[:300]}" for duration, sql in top),
+            )
+        return response
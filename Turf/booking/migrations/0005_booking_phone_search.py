@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+import re
+
+from django.db import migrations, models
+
+
+def normalize_phone(phone):
+    # Frozen copy of booking.models.normalize_phone, so migrated rows match
+    # what Booking.save() writes.
+    phone = (phone or "").strip()
+    digits = re.sub(r"\D", "", phone)
+    if phone.startswith("+") and digits.startswith("91"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = digits.lstrip("0")
+    if len(digits) > 10:
+        digits = digits[-10:]
+    return digits
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    Booking = apps.get_model("booking", "Booking")
+    batch = []
+    for booking in Booking.objects.only("id", "phone").iterator(chunk_size=2000):
+        booking.phone_normalized = normalize_phone(booking.phone)
+        batch.append(booking)
+        if len(batch) >= 2000:
+            Booking.objects.bulk_update(batch, ["phone_normalized"])
+            batch = []
+    Booking.objects.bulk_update(batch, ["phone_normalized"])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Name search uses icontains; only Postgres can index that (pg_trgm).
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS booking_user_name_trgm "
+        "ON booking_booking USING gin (UPPER(user_name) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS booking_user_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
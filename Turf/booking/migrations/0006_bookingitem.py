@@ -0,0 +1,53 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_phone_search'),
+    ]
+
+    operations = [
+        # Turn the auto-created Booking.slots table into an explicit through
+        # model without touching the data, then add the price columns.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='BookingItem',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='booking.booking')),
+                        ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_items', to='booking.slot')),
+                    ],
+                    options={
+                        'db_table': 'booking_booking_slots',
+                        'unique_together': {('booking', 'slot')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='booking',
+                    name='slots',
+                    field=models.ManyToManyField(related_name='bookings', through='booking.BookingItem', to='booking.slot'),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddField(
+            model_name='bookingitem',
+            name='unit_price',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bookingitem',
+            name='discount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bookingitem',
+            name='price',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
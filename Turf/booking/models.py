@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+import re
 import uuid
 from datetime import datetime, timedelta
 
@@ -36,20 +38,61 @@ class Slot(models.Model):
 
 # ================= BOOKING =================
 
+def normalize_phone(phone):
+    """Digits only, without the +91 / leading-0 prefix.
+
+    The prefix is dropped whenever it is written, so partial numbers such
+    as "+91 98765" still match by prefix.
+    """
+    phone = (phone or "").strip()
+    digits = re.sub(r"\D", "", phone)
+    if phone.startswith("+") and digits.startswith("91"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = digits.lstrip("0")
+    if len(digits) > 10:
+        digits = digits[-10:]
+    return digits
+
+
 class Booking(models.Model):
     booking_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     user_name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15)
+    phone_normalized = models.CharField(max_length=15, blank=True, db_index=True, editable=False)
 
-    slots = models.ManyToManyField(Slot, related_name="bookings")
+    slots = models.ManyToManyField(Slot, related_name="bookings", through="BookingItem")
 
     total_amount = models.PositiveIntegerField(default=0)  # ✅ FIX
+    qr_code = models.TextField(blank=True, default="")  # base64 PNG, filled by worker
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user_name} | {self.booking_id}"
 
 
+# ================= BOOKING ITEM =================
+
+class BookingItem(models.Model):
+    """One booked slot with its price frozen at confirmation."""
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="items")
+    slot = models.ForeignKey(Slot, on_delete=models.CASCADE, related_name="booking_items")
+    unit_price = models.PositiveIntegerField(default=0)
+    discount = models.PositiveIntegerField(default=0)
+    price = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "booking_booking_slots"  # the table of the former auto M2M
+        unique_together = ("booking", "slot")
+
+    def __str__(self):
+        return f"{self.booking_id} | {self.slot_id} | ₹{self.price}"
+
+
 # ================= CONTACT =================
 
 class Contact(models.Model):
@@ -77,3 +120,38 @@ class SlotPricing(models.Model):
 
     def __str__(self):
         return f"{self.sport} | ₹{self.final_price()}"
+
+
+# ================= JOB QUEUE =================
+
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} | {self.status} | #{self.id}"
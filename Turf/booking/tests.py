@@ -0,0 +1,464 @@
+import importlib
+import io
+import threading
+import time as clock
+from datetime import date, time, timedelta
+
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import jobs
+from .middleware import AdmissionControlMiddleware, admission_counters, client_key
+from .models import Booking, Job, Slot, SlotPricing, Sport, normalize_phone
+from .utils import create_booking, get_slot_price, get_slot_prices, search_bookings
+
+
+def anonymous_request(**meta):
+    request = RequestFactory().get("/", **meta)
+    request.user = AnonymousUser()
+    return request
+
+
+# ================= ADMISSION CONTROL =================
+
+class ClientKeyTests(TestCase):
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=0)
+    def test_forwarded_header_ignored_without_trusted_proxies(self):
+        request = anonymous_request(REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6")
+        self.assertEqual(client_key(request), "ip:10.0.0.1")
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=1)
+    def test_spoofed_leftmost_entry_is_ignored(self):
+        request = anonymous_request(
+            REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 203.0.113.7"
+        )
+        self.assertEqual(client_key(request), "ip:203.0.113.7")
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=2)
+    def test_trusted_hops(self):
+        request = anonymous_request(
+            REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 203.0.113.7, 10.0.0.2"
+        )
+        self.assertEqual(client_key(request), "ip:203.0.113.7")
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=2)
+    def test_too_few_entries_falls_back_to_remote_addr(self):
+        request = anonymous_request(REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6")
+        self.assertEqual(client_key(request), "ip:10.0.0.1")
+
+
+@override_settings(ADMISSION_CONTROL_ENABLED=True, RATE_LIMITS={}, CONCURRENCY_LIMITS={"confirm_booking": 3})
+class AdmissionControlTests(TestCase):
+
+    def setUp(self):
+        caches["admission"].clear()
+        self.url = reverse("confirm_booking")
+
+    def slow_view(self, request):
+        clock.sleep(0.05)
+        return HttpResponse("ok")
+
+    def test_in_flight_counter_balances(self):
+        middleware = AdmissionControlMiddleware(self.slow_view)
+        statuses = []
+
+        def post():
+            statuses.append(middleware(RequestFactory().post(self.url)).status_code)
+
+        threads = [threading.Thread(target=post) for _ in range(10)]
+        with self.assertLogs("booking.middleware", "WARNING"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(statuses.count(200), 3)
+        self.assertEqual(statuses.count(503), 7)
+        self.assertEqual(caches["admission"].get("inflight:confirm_booking"), 0)
+        self.assertEqual(admission_counters()["confirm_booking"], {"admitted": 3, "rate_limited": 0, "shed": 7})
+
+    def test_get_requests_are_not_capped(self):
+        middleware = AdmissionControlMiddleware(self.slow_view)
+        middleware(RequestFactory().get(self.url))
+        self.assertIsNone(caches["admission"].get("inflight:confirm_booking"))
+
+    @override_settings(RATE_LIMITS={"confirm_booking": (2, 60)})
+    def test_rate_limit(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse("ok"))
+        statuses = [middleware(RequestFactory().post(self.url)).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    @override_settings(ADMISSION_CONTROL_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            AdmissionControlMiddleware(self.slow_view)
+        with self.assertLogs("booking.apps", "WARNING"):
+            apps.get_app_config("booking").ready()
+
+
+# ================= BOOKING =================
+
+class ConfirmBookingTests(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name="Football")
+        self.slot = Slot.objects.create(
+            sport=self.sport, date=timezone.localdate() + timedelta(days=1), time=time(18, 0)
+        )
+
+    def test_duplicate_post_is_replayed(self):
+        data = {
+            "slots[]": [self.slot.id],
+            "user_name": "Asha",
+            "phone": "9876543210",
+            "idempotency_key": "dup-key",
+        }
+        first = self.client.post(reverse("confirm_booking"), data)
+        second = self.client.post(reverse("confirm_booking"), data)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_new_key_does_not_rebook_taken_slot(self):
+        data = {"slots[]": [self.slot.id], "user_name": "Asha", "phone": "9876543210"}
+        self.client.post(reverse("confirm_booking"), {**data, "idempotency_key": "first"})
+        response = self.client.post(reverse("confirm_booking"), {**data, "idempotency_key": "second"})
+
+        self.assertRedirects(response, reverse("home"), fetch_redirect_response=False)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class RecurringBookingTests(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name="Football")
+        self.url = reverse("recurring_booking", args=[self.sport.id])
+        self.start = timezone.localdate() + timedelta(days=1)
+
+    def post(self, **data):
+        return self.client.post(self.url, {
+            "user_name": "Asha",
+            "phone": "9876543210",
+            "start_date": self.start.isoformat(),
+            "end_date": (self.start + timedelta(days=13)).isoformat(),
+            "weekdays[]": [str(self.start.weekday())],
+            "start_hour": "18",
+            "end_hour": "20",
+            "idempotency_key": "recurring-key",
+            **data,
+        })
+
+    def test_books_every_matching_slot(self):
+        response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+        booking = Booking.objects.get()
+        self.assertEqual(booking.slots.count(), 4)
+        self.assertEqual(Slot.objects.filter(is_booked=True).count(), 4)
+
+    def test_unbounded_span_is_rejected(self):
+        response = self.post(end_date="9999-12-31", start_hour="0", end_hour="24")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Slot.objects.exists())
+
+    def test_conflict_books_nothing_and_is_not_replayed(self):
+        Slot.objects.create(sport=self.sport, date=self.start, time=time(18, 0), is_booked=True)
+
+        self.assertEqual(self.post().status_code, 409)
+        self.assertFalse(Booking.objects.exists())
+
+        Slot.objects.update(is_booked=False)
+        self.assertEqual(self.post().status_code, 200)
+
+
+class PricingTests(TestCase):
+
+    def test_bulk_pricing_matches_single_slot_pricing(self):
+        football = Sport.objects.create(name="Football")
+        cricket = Sport.objects.create(name="Cricket")
+        special_day = date(2026, 5, 2)
+
+        SlotPricing.objects.create(sport=football, price=1800, start_time=time(18, 0), end_time=time(22, 0))
+        SlotPricing.objects.create(sport=football, price=1200, discount=100)
+        SlotPricing.objects.create(sport=football, price=2500, date=special_day)
+        SlotPricing.objects.create(sport=football, price=900, start_time=time(6, 0), end_time=time(7, 0), active=False)
+        SlotPricing.objects.create(sport=cricket, price=500, discount=500)
+
+        slots = [
+            Slot.objects.create(sport=sport, date=day, time=time(hour, 0))
+            for sport in (football, cricket)
+            for day in (date(2026, 5, 1), special_day)
+            for hour in (6, 12, 18, 22, 23)
+        ]
+
+        self.assertEqual(get_slot_prices(slots), {slot.id: get_slot_price(slot) for slot in slots})
+
+
+# ================= STAFF =================
+
+class BulkSlotUpdateTests(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name="Football")
+        self.url = reverse("bulk_slot_update", args=[self.sport.id])
+        self.day = date(2026, 5, 1)
+        self.client.force_login(User.objects.create_user("staff", password="x", is_staff=True))
+
+    def post(self, action, **data):
+        return self.client.post(self.url, {
+            "action": action,
+            "start_date": self.day.isoformat(),
+            "end_date": (self.day + timedelta(days=1)).isoformat(),
+            "start_hour": "6",
+            "end_hour": "9",
+            **data,
+        })
+
+    def test_block_creates_and_blocks_the_range(self):
+        Slot.objects.create(sport=self.sport, date=self.day, time=time(6, 0))
+
+        response = self.post("block")
+
+        self.assertEqual(response.json(), {"action": "block", "updated": 6, "created": 5})
+        self.assertEqual(Slot.objects.filter(is_booked=True).count(), 6)
+
+    def test_unblock_refuses_customer_bookings_without_force(self):
+        self.post("block")
+        create_booking("Asha", "9876543210", [Slot.objects.get(date=self.day, time=time(7, 0))])
+
+        response = self.post("unblock")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["booked"], 1)
+        self.assertEqual(Slot.objects.filter(is_booked=True).count(), 6)
+
+        response = self.post("unblock", force="1")
+        self.assertEqual(response.json()["updated"], 6)
+        self.assertFalse(Slot.objects.filter(is_booked=True).exists())
+
+    def test_staff_only(self):
+        self.client.logout()
+        response = self.post("block")
+        self.assertRedirects(response, reverse("staff_login"), fetch_redirect_response=False)
+        self.assertFalse(Slot.objects.exists())
+
+
+class BookingSearchTests(TestCase):
+
+    def setUp(self):
+        self.asha = Booking.objects.create(user_name="Asha Rao", phone="+91 98769 43210")
+        self.ravi = Booking.objects.create(user_name="Ravi Nair", phone="9877012345")
+        self.nine = Booking.objects.create(user_name="Nina Das", phone="9999912345")
+
+    def search(self, query):
+        return set(search_bookings(Booking.objects.all(), query))
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone("+91 98765"), "98765")
+        self.assertEqual(normalize_phone("098765"), "98765")
+        self.assertEqual(normalize_phone("+91 98765 43210"), "9876543210")
+        self.assertEqual(normalize_phone("919876543210"), "9876543210")
+
+    def test_migration_backfill_matches_save(self):
+        migration = importlib.import_module("booking.migrations.0005_booking_phone_search")
+        for phone in ["0442345678", "+91 98765 43210", "919876543210", "98765", "", "+1 415 555 0100"]:
+            self.assertEqual(migration.normalize_phone(phone), normalize_phone(phone), phone)
+
+    def test_partial_number_with_country_code(self):
+        self.assertEqual(self.search("+91 98769"), {self.asha})
+
+    def test_prefix_ending_in_nine(self):
+        self.assertEqual(self.search("98769"), {self.asha})
+        self.assertEqual(self.search("9876"), {self.asha})
+        self.assertEqual(self.search("99999"), {self.nine})
+        self.assertEqual(self.search("9"), {self.asha, self.ravi, self.nine})
+
+    def test_name_and_booking_id(self):
+        self.assertEqual(self.search("nair"), {self.ravi})
+        self.assertEqual(self.search(str(self.asha.booking_id)), {self.asha})
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        self.url = reverse("home")
+
+    def test_staff_get_a_profile(self):
+        self.client.force_login(User.objects.create_user("staff", password="x", is_staff=True))
+
+        response = self.client.get(self.url, {"profile": "1"})
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn("function calls", response.content.decode())
+
+        response = self.client.get(self.url, HTTP_X_PROFILE="raw")
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+
+    def test_only_explicit_modes_profile(self):
+        self.client.force_login(User.objects.create_user("staff", password="x", is_staff=True))
+        for response in (
+            self.client.get(self.url, {"profile": "0"}),
+            self.client.get(self.url, HTTP_X_PROFILE="0"),
+        ):
+            self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+    def test_non_staff_are_not_profiled(self):
+        self.client.force_login(User.objects.create_user("customer", password="x"))
+        response = self.client.get(self.url, {"profile": "1"})
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+        self.assertNotIn("function calls", response.content.decode())
+
+
+class BookingItemTests(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name="Football")
+        SlotPricing.objects.create(sport=self.sport, price=1800, start_time=time(18, 0), end_time=time(22, 0))
+        SlotPricing.objects.create(sport=self.sport, price=1200, discount=100)
+        self.slots = [
+            Slot.objects.create(sport=self.sport, date=date(2026, 5, 1), time=time(hour, 0))
+            for hour in (17, 18)
+        ]
+
+    def test_create_booking_snapshots_prices(self):
+        booking, _ = create_booking("Asha", "9876543210", self.slots)
+
+        items = booking.items.order_by("slot__time")
+        self.assertEqual(
+            [(item.unit_price, item.discount, item.price) for item in items],
+            [(1200, 100, 1100), (1800, 0, 1800)],
+        )
+        self.assertEqual(booking.total_amount, 2900)
+        self.assertEqual(Slot.objects.filter(is_booked=True).count(), 2)
+
+        # later price changes do not touch the booking
+        SlotPricing.objects.update(price=5000)
+        self.assertEqual(sum(booking.items.values_list("price", flat=True)), 2900)
+
+    def test_backfill_prices_old_items(self):
+        booking = Booking.objects.create(user_name="Asha", phone="9876543210")
+        booking.slots.add(*self.slots)
+
+        call_command("backfill_booking_items", stdout=io.StringIO())
+
+        booking.refresh_from_db()
+        self.assertEqual(sorted(booking.items.values_list("price", flat=True)), [1100, 1800])
+        self.assertEqual(booking.total_amount, 2900)
+
+
+class BookingItemMigrationTests(TransactionTestCase):
+    """0006 turns the existing booking_booking_slots table into BookingItem."""
+
+    before = [("booking", "0005_booking_phone_search")]
+    after = [("booking", "0006_bookingitem")]
+
+    def tearDown(self):
+        call_command("migrate", verbosity=0)
+
+    def test_existing_links_become_items(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+
+        sport = old_apps.get_model("booking", "Sport").objects.create(name="Football")
+        slot = old_apps.get_model("booking", "Slot").objects.create(sport=sport, date=date(2026, 5, 1), time=time(18, 0))
+        booking = old_apps.get_model("booking", "Booking").objects.create(user_name="Asha", phone="9876543210")
+        booking.slots.add(slot)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        new_apps = executor.loader.project_state(self.after).apps
+
+        item = new_apps.get_model("booking", "BookingItem").objects.get()
+        self.assertEqual((item.booking_id, item.slot_id, item.price), (booking.id, slot.id, 0))
+
+
+# ================= ANALYTICS =================
+
+class DemandReportTests(TestCase):
+
+    def test_weekday_heatmap_and_denominator(self):
+        from .analytics import WEEKDAYS, build_demand_report
+
+        sport = Sport.objects.create(name="Football")
+        today = timezone.localdate()
+        day = today - timedelta(days=3)
+
+        def book(on, hour):
+            slot = Slot.objects.create(sport=sport, date=on, time=time(hour, 0))
+            create_booking("Asha", "9876543210", [slot])
+
+        # A two-week window holds every weekday exactly twice.
+        book(day, 18)
+        book(day - timedelta(days=7), 18)
+        book(day - timedelta(days=1), 6)
+        book(today, 18)  # outside the window
+
+        report = build_demand_report(weeks=2, recent_weeks=1)["sports"][0]
+        heatmap = {row["day"]: [cell["u"] for cell in row["cells"]] for row in report["heatmap"]}
+
+        self.assertEqual(report["bookings"], 3)
+        self.assertEqual(heatmap[WEEKDAYS[day.weekday()]][18], 1.0)
+        self.assertEqual(heatmap[WEEKDAYS[(day - timedelta(days=1)).weekday()]][6], 0.5)
+        self.assertEqual(sum(sum(cells) for cells in heatmap.values()), 1.5)
+
+        # recent week booked, previous week booked: no trend on that cell
+        row = next(row for row in report["heatmap"] if row["day"] == WEEKDAYS[day.weekday()])
+        self.assertEqual(row["cells"][18]["trend"], 0)
+
+# ================= JOB QUEUE =================
+
+class JobQueueTests(TestCase):
+
+    def test_jobs_are_claimed_once(self):
+        job_ids = {Job.objects.create(name="booking.render_qr", payload={}).id for _ in range(3)}
+
+        self.assertEqual(set(jobs.claim_due(limit=10)), job_ids)
+        self.assertEqual(jobs.claim_due(limit=10), [])
+        self.assertEqual(Job.objects.filter(status=Job.RUNNING, attempts=1).count(), 3)
+
+    def test_exhausted_jobs_are_not_claimed(self):
+        Job.objects.create(name="booking.render_qr", payload={}, attempts=5, max_attempts=5)
+        self.assertEqual(jobs.claim_due(limit=10), [])
+
+    def test_stale_jobs_fail_once_attempts_run_out(self):
+        retry = Job.objects.create(name="a", status=Job.RUNNING, attempts=1, max_attempts=5)
+        give_up = Job.objects.create(name="b", status=Job.RUNNING, attempts=5, max_attempts=5)
+        Job.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        retry.refresh_from_db()
+        give_up.refresh_from_db()
+        self.assertEqual(retry.status, Job.PENDING)
+        self.assertEqual(give_up.status, Job.FAILED)
+
+    def test_prune_done_keeps_recent_and_failed_jobs(self):
+        old = timezone.now() - timedelta(days=30)
+        Job.objects.create(name="a", status=Job.DONE)
+        Job.objects.create(name="b", status=Job.FAILED)
+        Job.objects.create(name="c", status=Job.DONE)
+        Job.objects.filter(name__in=["b", "c"]).update(updated_at=old)
+
+        self.assertEqual(jobs.prune_done(days=7), 1)
+        self.assertEqual(set(Job.objects.values_list("name", flat=True)), {"a", "b"})
+
+    def test_qr_is_pending_until_rendered(self):
+        booking = Booking.objects.create(user_name="Asha", phone="9876543210")
+        url = reverse("booking_qr", args=[booking.booking_id])
+
+        self.assertEqual(self.client.get(url).status_code, 202)
+        jobs.render_booking_qr(booking.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
@@ -10,6 +10,10 @@ urlpatterns = [
     # ---------- STAFF PANEL ----------
     path("staff/booking/<int:sport_id>/", views.staff_slots_view, name="staff_slots"),
     path("staff/toggle/<int:slot_id>/", views.toggle_slot_booking, name="toggle_slot"),
+    path("staff/bulk/<int:sport_id>/", views.bulk_slot_update, name="bulk_slot_update"),
+    path("staff/search/", views.staff_search, name="staff_search"),
+    path("staff/analytics/", views.staff_analytics, name="staff_analytics"),
+    path("staff/admission/", views.admission_stats, name="admission_stats"),
 
     # ---------- PUBLIC ----------
     path("", views.home, name="home"),
@@ -17,10 +21,12 @@ urlpatterns = [
     path("booking/details/", views.user_details, name="user_details"),
     path("payment/", views.payment_page, name="payment"),
     path("confirm/", views.confirm_booking, name="confirm_booking"),
+    path("recurring/<int:sport_id>/", views.recurring_booking, name="recurring_booking"),
 
     # ---------- VERIFY & DOWNLOAD ----------
     path("verify/<uuid:booking_id>/", views.verify_booking, name="verify_booking"),
     path("download/<uuid:booking_id>/", views.download_booking_pdf, name="download_booking_pdf"),
+    path("qr/<uuid:booking_id>/", views.booking_qr, name="booking_qr"),
 
     # ---------- STATIC ----------
     path("gallery/", views.gallery, name="gallery"),
@@ -1,6 +1,16 @@
+import base64
+import re
+import uuid
+from datetime import datetime, timedelta
+from io import BytesIO
+
 from django.shortcuts import redirect
 from django.db import models
-from .models import SlotPricing
+from django.conf import settings
+from .models import SlotPricing, Booking, BookingItem, Slot, normalize_phone
+
+DEFAULT_SLOT_PRICE = 1599
+
 
 def get_slot_price(slot):
     pricing = SlotPricing.objects.filter(
@@ -10,7 +20,7 @@ def get_slot_price(slot):
         models.Q(date=slot.date) | models.Q(date__isnull=True),
         models.Q(start_time__lte=slot.time) | models.Q(start_time__isnull=True),
         models.Q(end_time__gte=slot.time) | models.Q(end_time__isnull=True),
-    ).order_by("-date").first()
+    ).order_by(models.F("date").desc(nulls_last=True), "id").first()
 
     if pricing:
         price = pricing.final_price()
@@ -18,4 +28,160 @@ def get_slot_price(slot):
             return price
 
     # 🔥 ABSOLUTE FALLBACK (NEVER ZERO)
-    return 1599
+    return DEFAULT_SLOT_PRICE
+
+
+def get_slot_prices(slots):
+    """Price many slots with one pricing query; same rules as get_slot_price.
+
+    Returns {slot.id: price}. Meant for bulk flows that would otherwise
+    run one query per slot.
+    """
+    return {slot_id: item[2] for slot_id, item in get_slot_price_items(slots).items()}
+
+
+def get_slot_price_items(slots):
+    """Like get_slot_prices, but {slot.id: (unit_price, discount, price)}.
+
+    This is what a BookingItem snapshots at confirmation.
+    """
+    slots = list(slots)
+    if not slots:
+        return {}
+
+    rules = list(SlotPricing.objects.filter(
+        sport_id__in={slot.sport_id for slot in slots},
+        active=True,
+    ).filter(
+        models.Q(date__in={slot.date for slot in slots}) | models.Q(date__isnull=True),
+    ).order_by(models.F("date").desc(nulls_last=True), "id"))
+
+    items = {}
+    for slot in slots:
+        item = (DEFAULT_SLOT_PRICE, 0, DEFAULT_SLOT_PRICE)
+        for rule in rules:
+            if (
+                rule.sport_id == slot.sport_id
+                and rule.date in (slot.date, None)
+                and (rule.start_time is None or rule.start_time <= slot.time)
+                and (rule.end_time is None or rule.end_time >= slot.time)
+            ):
+                if rule.final_price() > 0:
+                    item = (rule.price, min(rule.discount, rule.price), rule.final_price())
+                break
+        items[slot.id] = item
+    return items
+
+
+def create_booking(user_name, phone, slots):
+    """Book already-locked free slots with their prices snapshotted.
+
+    One pricing query, one booking insert, one bulk insert of items and
+    one UPDATE marking the slots booked. Returns (booking, items).
+    """
+    prices = get_slot_price_items(slots)
+
+    booking = Booking.objects.create(
+        user_name=user_name,
+        phone=phone,
+        total_amount=sum(price for _, _, price in prices.values()),
+    )
+    items = BookingItem.objects.bulk_create([
+        BookingItem(
+            booking=booking,
+            slot=slot,
+            unit_price=prices[slot.id][0],
+            discount=prices[slot.id][1],
+            price=prices[slot.id][2],
+        )
+        for slot in slots
+    ])
+    Slot.objects.filter(id__in=[slot.id for slot in slots]).update(is_booked=True)
+    return booking, items
+
+
+def booked_slot_rows(items):
+    """Template rows (start/end labels, price, sport, date) for booking items."""
+    rows = []
+    for item in items:
+        start = datetime.combine(item.slot.date, item.slot.time)
+        rows.append({
+            "start": start.strftime("%I:%M %p").lstrip("0"),
+            "end": (start + timedelta(hours=1)).strftime("%I:%M %p").lstrip("0"),
+            "price": item.price,
+            "sport": item.slot.sport.name,
+            "date": item.slot.date,
+        })
+    return rows
+
+
+def ensure_slots(sport, dates, times):
+    """Create any missing slots of the dates × times grid in one bulk insert.
+
+    Returns the number of slots that had to be created.
+    """
+    existing = set(
+        Slot.objects.filter(sport=sport, date__in=dates, time__in=times)
+        .values_list("date", "time")
+    )
+    missing = [
+        Slot(sport=sport, date=d, time=t)
+        for d in dates
+        for t in times
+        if (d, t) not in existing
+    ]
+    Slot.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing)
+
+
+# ================= SEARCH =================
+
+def search_bookings(queryset, query):
+    """Filter bookings by booking ID, phone prefix or name.
+
+    Phone lookups are a range scan on the indexed phone_normalized column,
+    which every backend serves from a plain b-tree. Name lookups use
+    icontains, backed by a pg_trgm index on Postgres.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset.none()
+
+    try:
+        return queryset.filter(booking_id=uuid.UUID(query))
+    except ValueError:
+        pass
+
+    if re.fullmatch(r"[\d\s+\-()]+", query):
+        digits = normalize_phone(query)
+        if not digits:
+            return queryset.none()
+        matches = queryset.filter(phone_normalized__gte=digits)
+        # Upper bound is the next digit string ("98769" -> "9877"), computed
+        # with a carry so it stays digits-only and sorts correctly under any
+        # collation. An all-9s prefix has no upper bound.
+        carried = digits.rstrip("9")
+        if carried:
+            matches = matches.filter(phone_normalized__lt=carried[:-1] + str(int(carried[-1]) + 1))
+        return matches
+
+    return queryset.filter(user_name__icontains=query)
+
+
+# ================= QR =================
+
+def generate_qr_base64(booking):
+    import qrcode  # heavy (pulls in PIL); imported on first QR only
+
+    qr = qrcode.make(f"{settings.SITE_URL}/verify/{booking.booking_id}/")
+    buf = BytesIO()
+    qr.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def get_booking_qr(booking):
+    """Stored QR for the booking, rendered and saved now if the worker hasn't yet."""
+    if not booking.qr_code:
+        booking.qr_code = generate_qr_base64(booking)
+        Booking.objects.filter(pk=booking.pk).update(qr_code=booking.qr_code)
+    return booking.qr_code
@@ -2,7 +2,6 @@ from datetime import datetime, timedelta, time
 from functools import wraps
 import base64
 from io import BytesIO
-import qrcode
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
@@ -10,14 +9,18 @@ from django.http import JsonResponse, HttpResponse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.db import transaction
+from django.db.models import Prefetch
+from django.core.paginator import Paginator
 from django.conf import settings
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-
 from .models import Sport, Slot, Booking, Contact
-from .utils import get_slot_price
+from .utils import (
+    get_slot_price, get_slot_prices, get_booking_qr, ensure_slots, search_bookings,
+    create_booking, booked_slot_rows,
+)
+from .idempotency import idempotent, issue_key
+from .middleware import admission_counters
+from . import jobs
 from gallery.models import GalleryImage
 
 
@@ -89,6 +92,7 @@ def staff_slots_view(request, sport_id):
         "dates": [timezone.localdate() + timedelta(days=i) for i in range(7)],
         "today": timezone.localdate(),
         "current_hour": timezone.localtime().hour,
+        "hours": range(24),
     })
 
 
@@ -101,6 +105,93 @@ def toggle_slot_booking(request, slot_id):
     return JsonResponse({"booked": slot.is_booked})
 
 
+@require_POST
+@staff_required
+def bulk_slot_update(request, sport_id):
+    """Block or unblock every slot in a date × hour range with one UPDATE."""
+    sport = get_object_or_404(Sport, id=sport_id)
+
+    try:
+        start_date = datetime.strptime(request.POST.get("start_date", ""), "%Y-%m-%d").date()
+        end_date = datetime.strptime(request.POST.get("end_date", ""), "%Y-%m-%d").date()
+        start_hour = int(request.POST.get("start_hour", ""))
+        end_hour = int(request.POST.get("end_hour", ""))
+    except ValueError:
+        return JsonResponse({"error": "Invalid dates or hours"}, status=400)
+
+    action = request.POST.get("action")
+    force = request.POST.get("force") == "1"
+    days = (end_date - start_date).days + 1
+
+    if action not in ("block", "unblock"):
+        return JsonResponse({"error": "Unknown action"}, status=400)
+    if not 1 <= days <= getattr(settings, "BULK_SLOT_MAX_DAYS", 366):
+        return JsonResponse({"error": "Invalid date range"}, status=400)
+    if not 0 <= start_hour < end_hour <= 24:
+        return JsonResponse({"error": "Invalid hour range"}, status=400)
+
+    slots = Slot.objects.filter(
+        sport=sport,
+        date__range=(start_date, end_date),
+        time__gte=time(start_hour, 0),
+        time__lte=time(end_hour - 1, 0),
+    )
+
+    with transaction.atomic():
+        created = 0
+        if action == "block":
+            created = ensure_slots(
+                sport,
+                [start_date + timedelta(days=i) for i in range(days)],
+                [time(h, 0) for h in range(start_hour, end_hour)],
+            )
+        else:
+            booked = slots.filter(bookings__isnull=False).distinct().count()
+            if booked and not force:
+                return JsonResponse({
+                    "error": f"{booked} slot(s) in this range belong to customer bookings",
+                    "booked": booked,
+                }, status=409)
+
+        updated = slots.filter(is_booked=(action == "unblock")).update(is_booked=(action == "block"))
+
+    return JsonResponse({"action": action, "updated": updated, "created": created})
+
+
+@staff_required
+def staff_search(request):
+    query = request.GET.get("q", "").strip()
+    bookings = search_bookings(Booking.objects.all(), query).prefetch_related(
+        Prefetch("slots", queryset=Slot.objects.select_related("sport").order_by("date", "time"))
+    ).order_by("-created_at")
+
+    page = Paginator(bookings, 25).get_page(request.GET.get("page"))
+
+    return render(request, "booking/staff_search.html", {
+        "query": query,
+        "page": page,
+    })
+
+
+@staff_required
+def staff_analytics(request):
+    from .analytics import demand_report  # numpy; staff-only page
+
+    report = demand_report(refresh=request.GET.get("refresh") == "1")
+    return render(request, "booking/staff_analytics.html", {
+        "report": report,
+        "hours": range(24),
+    })
+
+
+@staff_required
+def admission_stats(request):
+    return JsonResponse({
+        "enabled": getattr(settings, "ADMISSION_CONTROL_ENABLED", False),
+        "counters": admission_counters(),
+    })
+
+
 # ================= PUBLIC =================
 
 def home(request):
@@ -154,35 +245,31 @@ def payment_page(request):
         return redirect("home")
 
     slot_ids = request.POST.getlist("slots[]")
-    slots = Slot.objects.filter(id__in=slot_ids).order_by("time")
+    slots = list(Slot.objects.filter(id__in=slot_ids).select_related("sport").order_by("time"))
+    prices = get_slot_prices(slots)
 
     total = 0
     for slot in slots:
         start = datetime.combine(slot.date, slot.time)
         slot.start_label = start.strftime("%I:%M %p").lstrip("0")
         slot.end_label = (start + timedelta(hours=1)).strftime("%I:%M %p").lstrip("0")
-        slot.price = get_slot_price(slot)
+        slot.price = prices[slot.id]
         total += slot.price
 
     return render(request, "booking/payment.html", {
         "slots": slots,
         "total": total,
-        "sport": slots.first().sport if slots else None,
-        "date": slots.first().date if slots else None,
+        "sport": slots[0].sport if slots else None,
+        "date": slots[0].date if slots else None,
         "user_name": request.POST.get("user_name"),
         "phone": request.POST.get("phone"),
+        "idempotency_key": issue_key(),
     })
 
 
 # ================= BOOKING =================
 
-def generate_qr_base64(booking):
-    qr = qrcode.make(f"{settings.SITE_URL}/verify/{booking.booking_id}/")
-    buf = BytesIO()
-    qr.save(buf, format="PNG")
-    return base64.b64encode(buf.getvalue()).decode()
-
-
+@idempotent
 @transaction.atomic
 def confirm_booking(request):
     if request.method != "POST":
@@ -195,64 +282,205 @@ def confirm_booking(request):
     if not slot_ids or not user_name or not phone:
         return redirect("home")
 
-    slots = Slot.objects.filter(
-        id__in=slot_ids,
-        is_booked=False
-    ).order_by("time")
+    slots = list(
+        Slot.objects.select_for_update()
+        .select_related("sport")
+        .filter(id__in=slot_ids, is_booked=False)
+        .order_by("time")
+    )
 
-    if not slots.exists():
+    if not slots:
         return redirect("home")
 
-    booking = Booking.objects.create(
-        user_name=user_name,
-        phone=phone
-    )
+    booking, items = create_booking(user_name, phone, slots)
 
-    total_amount = 0
-    booked_slots = []
+    # QR rendering and notifications run in the worker after commit
+    jobs.enqueue("booking.render_qr", booking_id=booking.id)
+    jobs.enqueue("booking.notify_confirmed", booking_id=booking.id)
 
-    for slot in slots:
-        price = get_slot_price(slot)
-        total_amount += price
+    return render(request, "booking/success.html", {
+        "booking": booking,
+        "booked_slots": booked_slot_rows(items),
+        "total_amount": booking.total_amount,
+    })
 
-        booking.slots.add(slot)
 
-        start = datetime.combine(slot.date, slot.time)
-        booked_slots.append({
-            "start": start.strftime("%I:%M %p").lstrip("0"),
-            "end": (start + timedelta(hours=1)).strftime("%I:%M %p").lstrip("0"),
-            "price": price,
-            "sport": slot.sport.name,
-            "date": slot.date,
-        })
+# ================= RECURRING =================
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _recurring_targets(start_date, end_date, weekdays, start_hour, end_hour):
+    now = timezone.localtime()
+    dates = [
+        start_date + timedelta(days=i)
+        for i in range((end_date - start_date).days + 1)
+        if (start_date + timedelta(days=i)).weekday() in weekdays
+    ]
+    hours = range(start_hour, end_hour)
+    return [
+        (d, time(h, 0))
+        for d in dates
+        for h in hours
+        if not (d == now.date() and h < now.hour)
+    ]
+
+
+@idempotent
+@transaction.atomic
+def recurring_booking(request, sport_id):
+    sport = get_object_or_404(Sport, id=sport_id)
+    today = timezone.localdate()
+    context = {
+        "sport": sport,
+        "weekdays": list(enumerate(WEEKDAYS)),
+        "hours": range(25),
+        "today": today,
+        "idempotency_key": issue_key(),
+        "form": request.POST,
+        "selected_weekdays": request.POST.getlist("weekdays[]"),
+    }
+
+    if request.method != "POST":
+        return render(request, "booking/recurring.html", context)
+
+    try:
+        start_date = datetime.strptime(request.POST.get("start_date", ""), "%Y-%m-%d").date()
+        end_date = datetime.strptime(request.POST.get("end_date", ""), "%Y-%m-%d").date()
+        start_hour = int(request.POST.get("start_hour", ""))
+        end_hour = int(request.POST.get("end_hour", ""))
+        weekdays = {int(d) for d in request.POST.getlist("weekdays[]")}
+    except ValueError:
+        context["error"] = "Please fill in every field."
+        return render(request, "booking/recurring.html", context, status=400)
 
-        slot.is_booked = True
-        slot.save()
+    user_name = request.POST.get("user_name")
+    phone = request.POST.get("phone")
+    max_days = getattr(settings, "RECURRING_BOOKING_MAX_DAYS", 366)
+
+    if not user_name or not phone or not weekdays:
+        context["error"] = "Please fill in every field."
+    elif start_date < today or end_date < start_date:
+        context["error"] = "Choose a date range that starts today or later."
+    elif not 0 <= start_hour < end_hour <= 24:
+        context["error"] = "The end time must be after the start time."
+    elif (end_date - start_date).days >= max_days:
+        context["error"] = f"Recurring bookings can cover at most {max_days} days."
+    if "error" in context:
+        # Errors are not 200, so @idempotent does not replay them on resubmit
+        return render(request, "booking/recurring.html", context, status=400)
+
+    targets = _recurring_targets(start_date, end_date, weekdays, start_hour, end_hour)
+    max_slots = getattr(settings, "RECURRING_BOOKING_MAX_SLOTS", 500)
+    if not targets:
+        context["error"] = "No upcoming slots match that pattern."
+    elif len(targets) > max_slots:
+        context["error"] = f"That pattern covers {len(targets)} slots; the limit is {max_slots}."
+    if "error" in context:
+        return render(request, "booking/recurring.html", context, status=400)
+
+    # Materialize missing slots, then lock the whole range with one query
+    dates = {d for d, _ in targets}
+    times = {t for _, t in targets}
+    ensure_slots(sport, dates, times)
+
+    wanted = set(targets)
+    slots = [
+        slot for slot in Slot.objects.select_for_update()
+        .select_related("sport")
+        .filter(sport=sport, date__in=dates, time__in=times)
+        .order_by("date", "time")
+        if (slot.date, slot.time) in wanted
+    ]
+
+    conflicts = [slot for slot in slots if slot.is_booked]
+    if conflicts:
+        context["error"] = "Some of those slots are already booked. Nothing was reserved."
+        context["conflicts"] = conflicts
+        return render(request, "booking/recurring.html", context, status=409)
+
+    booking, items = create_booking(user_name, phone, slots)
+
+    jobs.enqueue("booking.render_qr", booking_id=booking.id)
+    jobs.enqueue("booking.notify_confirmed", booking_id=booking.id)
 
     return render(request, "booking/success.html", {
         "booking": booking,
-        "booked_slots": booked_slots,
-        "total_amount": total_amount,
-        "qr_code": generate_qr_base64(booking),
+        "booked_slots": booked_slot_rows(items),
+        "total_amount": booking.total_amount,
+        "multi_day": len(dates) > 1,
     })
 
 
 # ================= VERIFY / PDF =================
 
+def _booking_items(booking):
+    return list(booking.items.select_related("slot__sport").order_by("slot__date", "slot__time"))
+
+
 def verify_booking(request, booking_id):
     booking = get_object_or_404(Booking, booking_id=booking_id)
-    return render(request, "booking/verify.html", {"booking": booking})
+    items = _booking_items(booking)
+    slots = [item.slot for item in items]
+
+    now = timezone.localtime()
+    status, active_slot = "invalid", None
+    for slot in slots:
+        start = timezone.make_aware(datetime.combine(slot.date, slot.time))
+        if start <= now < start + timedelta(hours=1):
+            status, active_slot = "valid", slot
+            break
+    else:
+        if slots:
+            last_end = timezone.make_aware(datetime.combine(slots[-1].date, slots[-1].time)) + timedelta(hours=1)
+            status = "expired" if now >= last_end else "early"
+
+    return render(request, "booking/verify.html", {
+        "booking": booking,
+        "items": items,
+        "slots": slots,
+        "slot": active_slot,
+        "status": status,
+    })
+
+
+def booking_qr(request, booking_id):
+    booking = get_object_or_404(Booking, booking_id=booking_id)
+
+    # 202 until the worker has rendered it; ?render=1 renders it here instead
+    if not booking.qr_code and request.GET.get("render") != "1":
+        return HttpResponse(status=202)
+    return HttpResponse(base64.b64decode(get_booking_qr(booking)), content_type="image/png")
 
 
 def download_booking_pdf(request, booking_id):
+    # reportlab is only needed here; keep it out of worker start-up
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+
     booking = get_object_or_404(Booking, booking_id=booking_id)
 
     response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = f'attachment; filename="booking_{booking.booking_id}.pdf"'
 
     p = canvas.Canvas(response, pagesize=A4)
-    qr_img = ImageReader(BytesIO(base64.b64decode(generate_qr_base64(booking))))
+    qr_img = ImageReader(BytesIO(base64.b64decode(get_booking_qr(booking))))
     p.drawImage(qr_img, 100, 500, 200, 200)
+
+    y = 470
+    p.drawString(100, y, f"Booking ID: {booking.booking_id}")
+    p.drawString(100, y - 18, f"Name: {booking.user_name}    Phone: {booking.phone}")
+    y -= 50
+    for item in _booking_items(booking):
+        if y < 80:
+            p.showPage()
+            y = 780
+        p.drawString(100, y, f"{item.slot.sport.name}  {item.slot.date}  {item.slot.display_time()}")
+        p.drawRightString(480, y, f"Rs. {item.price}")
+        y -= 18
+    p.drawString(100, y - 10, "Total")
+    p.drawRightString(480, y - 10, f"Rs. {booking.total_amount}")
     p.showPage()
     p.save()
     return response
@@ -0,0 +1,40 @@
+from importlib import import_module
+
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+
+# Loaded lazily by the views that need them (QR, PDF).
+HEAVY_MODULES = (
+    "PIL.Image",
+    "PIL.PngImagePlugin",
+    "qrcode",
+    "qrcode.image.pil",
+    "reportlab.lib.utils",
+    "reportlab.pdfgen.canvas",
+)
+
+TEMPLATES = (
+    "booking/home.html",
+    "booking/slots.html",
+    "booking/user_details.html",
+    "booking/payment.html",
+    "booking/success.html",
+    "booking/verify.html",
+)
+
+
+def preload():
+    """Import heavy dependencies and compile the hot templates up front.
+
+    Meant for servers that load the app once and fork workers from it
+    (e.g. gunicorn --preload), so the cost is paid before forking instead
+    of by the first visitor of every worker.
+    """
+    for name in HEAVY_MODULES:
+        import_module(name)
+
+    for name in TEMPLATES:
+        try:
+            get_template(name)
+        except TemplateDoesNotExist:
+            pass
@@ -1,4 +1,7 @@
 #!/usr/bin/env bash
+# Build command for the web and worker services; the worker's start
+# command is worker.sh.
 pip install -r requirements.txt
 python manage.py migrate
+python manage.py createcachetable
 python manage.py collectstatic --noinput
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 # =========================
 
 MIDDLEWARE = [
+    "booking.middleware.SlowRequestMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -57,6 +58,8 @@ MIDDLEWARE = [
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "booking.middleware.ProfilingMiddleware",
+    "booking.middleware.AdmissionControlMiddleware",
 ]
 
 
@@ -105,6 +108,43 @@ DATABASES = {
 }
 
 
+# =========================
+# CACHE
+# =========================
+# Shared between workers so idempotency keys survive a request landing
+# on a different process. Run `manage.py createcachetable` for the DB cache.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        },
+        "admission": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "KEY_PREFIX": "admission",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+            # The default cap (300) culls a third of the table when full,
+            # which would drop live idempotency keys along with stale ones.
+            "OPTIONS": {"MAX_ENTRIES": 100_000},
+        },
+        # Admission control is switched off without Redis (see below); this
+        # alias only keeps the middleware importable.
+        "admission": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "admission",
+            "OPTIONS": {"MAX_ENTRIES": 10_000},
+        },
+    }
+
+
 # =========================
 # PASSWORD VALIDATION
 # =========================
@@ -170,3 +210,95 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # =========================
 
 SITE_URL = "https://turf-booking-django.onrender.com"
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+
+JOB_QUEUE_WORKERS = int(os.environ.get("JOB_QUEUE_WORKERS", 2))
+JOB_QUEUE_MAX_ATTEMPTS = 5
+JOB_QUEUE_RETRY_DELAY = 30  # seconds, doubled on every retry
+JOB_QUEUE_STALE_AFTER = 600  # seconds before a RUNNING job is requeued
+JOB_QUEUE_RETENTION_DAYS = 7  # finished jobs are deleted after this
+
+BOOKING_NOTIFY_EMAILS = [
+    email for email in os.environ.get("BOOKING_NOTIFY_EMAILS", "").split(",") if email
+]
+
+
+# =========================
+# IDEMPOTENT BOOKING
+# =========================
+
+IDEMPOTENCY_KEY_TTL = 15 * 60  # seconds a confirmed result is replayed
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+IDEMPOTENCY_WAIT = 5  # seconds a duplicate waits for the first attempt
+
+
+# =========================
+# BULK BOOKING LIMITS
+# =========================
+
+RECURRING_BOOKING_MAX_SLOTS = 500  # slots a single recurring request may claim
+RECURRING_BOOKING_MAX_DAYS = 366  # widest date range, checked before slots are counted
+
+BULK_SLOT_MAX_DAYS = 366  # widest range staff can block/unblock at once
+
+
+# =========================
+# ADMISSION CONTROL
+# =========================
+
+# Limits need counters shared by every worker. Without Redis they would be
+# per-process numbers, so the middleware switches itself off and warns.
+ADMISSION_CONTROL_ENABLED = bool(os.environ.get("REDIS_URL"))
+
+# url name: (requests, seconds) allowed per client
+RATE_LIMITS = {
+    "slots": (60, 60),
+    "payment": (20, 60),
+    "confirm_booking": (10, 60),
+    "recurring_booking": (10, 60),
+}
+
+# url name: max POSTs in flight across all workers
+CONCURRENCY_LIMITS = {
+    "confirm_booking": 8,
+    "recurring_booking": 2,
+}
+
+# Reverse proxies in front of the app whose X-Forwarded-For entries can be
+# trusted. On Render (which sets RENDER) REMOTE_ADDR is the load balancer,
+# so one hop is trusted there; elsewhere clients are keyed on REMOTE_ADDR.
+RATE_LIMIT_TRUSTED_PROXIES = int(
+    os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", 1 if os.environ.get("RENDER") else 0)
+)
+
+
+# =========================
+# STARTUP
+# =========================
+
+# Import QR/PDF libraries at start-up instead of on first use. Only worth it
+# when the server forks workers from a preloaded app (gunicorn --preload).
+PRELOAD_HEAVY_IMPORTS = os.environ.get("PRELOAD_HEAVY_IMPORTS") == "1"
+
+
+# =========================
+# PROFILING
+# =========================
+
+# Requests slower than this are logged to "booking.slow_requests".
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_REQUEST_TOP_QUERIES = 3
+
+# Staff can add ?profile=1 to any URL for a cProfile report.
+PROFILE_TOP_FUNCTIONS = 40
+
+
+# =========================
+# ANALYTICS
+# =========================
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60  # demand report, rebuilt by `manage.py demand_report`
@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+# Start command for the background worker service (Render "Background
+# Worker" with the same repo, build command and environment as the web
+# service). It renders booking QR codes and sends booking notifications;
+# without it those jobs stay pending and QR codes are rendered inline.
+python manage.py run_worker